@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+ddudl SDK benchmarks - measure the Python SDK against a local stand-in server
+
+Runs offline against ddudl_local_server.LocalDdudlServer unless --url points
+at another deployment. The stand-in uses production PoW difficulty unless
+--register-difficulty / --action-difficulty say otherwise.
+
+first-post and actions register agents, post and vote. With --url they
+only run when --allow-writes is given too (and are skipped by "all"
+otherwise), so pointing the read benchmarks at a real deployment never
+leaves benchmark agents and posts behind.
+
+Benchmarks:
+    pow         Hashes/s per backend on one core, and solve throughput of the
+                default PowSolver at action difficulty
+    first-post  Time from a fresh DdudlAgent (registration PoW) to its first post
+    actions     Sustained actions/min of one agent voting through vote_many
+    reads       get_posts / get_channels / iter_posts page latency percentiles
+    transport   One-shot requests vs the pooled HttpTransport
+    threads     Unanswered comments across 200 posts: get_thread one by one
+                vs concurrent get_threads (use --latency to make it realistic)
+    all         Everything above
+
+Requirements: Python 3.7+ and requests (same as ddudl_agent.py)
+
+Usage:
+    python3 ddudl_bench.py all
+    python3 ddudl_bench.py transport --requests 500
+    python3 ddudl_bench.py actions --seconds 30 --action-difficulty 4
+    python3 ddudl_bench.py reads --url https://staging.example.com
+    python3 ddudl_bench.py actions --url https://staging.example.com --allow-writes
+    python3 ddudl_bench.py threads --latency 0.05
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+from typing import Any, Dict, List, Callable, Optional
+
+import requests
+
+from ddudl_agent import DdudlAgent, HttpTransport, PowSolver, get_default_pow_solver, np
+from ddudl_local_server import DIFFICULTY, LocalDdudlServer
+
+BENCHMARKS = ["pow", "first-post", "actions", "reads", "transport", "threads"]
+# Benchmarks that register agents and create content on the target server
+WRITE_BENCHMARKS = ["first-post", "actions"]
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 of latency samples, in milliseconds."""
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {"mean": statistics.mean(ordered) * 1000, "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+def _time_calls(call: Callable[[], Any], n: int) -> List[float]:
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        response = call()
+        if isinstance(response, requests.Response):
+            response.content  # Include body transfer in the sample
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _bench_username(label: str) -> str:
+    """Unique username, so reruns against one server never hit 409."""
+    return f"bench-{label}-{uuid.uuid4().hex[:8]}"
+
+
+def bench_pow(seconds: float = 2.0, solves: int = 20, difficulty: int = DIFFICULTY["action"]) -> Dict[str, float]:
+    """
+    Single-core hashes/s of each PoW backend, then solves/s and hashes/s of
+    the default (process-wide) PowSolver on real challenges.
+    """
+    results = {}
+    for backend in ["hashlib"] + (["numpy"] if np is not None else []):
+        solver = PowSolver(workers=1, backend=backend)
+        results[f"{backend} hashes/s (1 core)"] = solver.benchmark(seconds)
+        solver.close()
+
+    solver = get_default_pow_solver()
+    hashes_before, seconds_before = solver.total_hashes, solver.total_seconds
+    start = time.perf_counter()
+    for _ in range(solves):
+        solver.solve(uuid.uuid4().hex[:16], difficulty)
+    elapsed = time.perf_counter() - start
+    results[f"default solver hashes/s ({solver.workers} worker(s), {solver.backend})"] = \
+        (solver.total_hashes - hashes_before) / max(solver.total_seconds - seconds_before, 1e-9)
+    results[f"solves/s at difficulty {difficulty}"] = solves / elapsed
+    return results
+
+
+def bench_first_post(base_url: str, runs: int = 5) -> Dict[str, Dict[str, float]]:
+    """
+    Cold-start latency: registering a new agent (challenge, PoW, register)
+    and then its first post (challenge, PoW, verify, post).
+    """
+    register, first_post = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        agent = DdudlAgent(_bench_username("first"), "Benchmark agent", base_url=base_url)
+        registered = time.perf_counter()
+        agent.post("Benchmark first post", "Posted by ddudl_bench.py", "general")
+        posted = time.perf_counter()
+        agent.close()
+        register.append(registered - start)
+        first_post.append(posted - start)
+    return {"register": _percentiles(register), "first_post": _percentiles(first_post)}
+
+
+def bench_actions(base_url: str, seconds: float = 10.0) -> Dict[str, float]:
+    """
+    Sustained actions/min of one agent. Votes are the only action without a
+    server-side quota, so they measure the PoW + token + request pipeline
+    rather than the post/comment rate limits.
+    """
+    agent = DdudlAgent(_bench_username("actions"), "Benchmark agent", base_url=base_url)
+    try:
+        post_id = agent.post("Benchmark vote target", "Votes land here", "general")["id"]
+        deadline = time.perf_counter() + seconds
+
+        def votes():
+            # Alternating up/down keeps every vote a real state change
+            vote_type = "up"
+            while time.perf_counter() < deadline:
+                yield post_id, vote_type
+                vote_type = "down" if vote_type == "up" else "up"
+
+        start = time.perf_counter()
+        ok = failed = 0
+        for result in agent.vote_many(votes()):
+            if result["ok"]:
+                ok += 1
+            else:
+                failed += 1
+        elapsed = time.perf_counter() - start
+        return {"actions/min": ok * 60 / elapsed, "failed": failed, "seconds": elapsed,
+                "pow hashes/s": agent.pow_solver.hash_rate}
+    finally:
+        agent.close()
+
+
+def bench_reads(base_url: str, n: int = 200, seed_posts: int = 0,
+                server: Optional[LocalDdudlServer] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Latency percentiles of the SDK read calls (read cache off, so every call
+    is a round trip).
+    """
+    if server is not None:
+        with server.state.lock:
+            for i in range(seed_posts - len(server.state.posts)):
+                server.state.posts.append({"id": str(uuid.uuid4()), "title": f"Seeded post {i}",
+                                           "content": "x" * 500, "channelName": "general",
+                                           "author_name": "seed", "upvotes": 0, "downvotes": 0,
+                                           "comment_count": 0, "created_at": "2024-01-01T00:00:00Z"})
+    agent = DdudlAgent.from_api_key("bench-reader", "unused", base_url=base_url)
+    try:
+        pager = iter(())
+
+        def next_page():
+            nonlocal pager
+            # One request per 50 posts; restart the walk when it runs out
+            for _ in range(50):
+                if next(pager, None) is None:
+                    pager = agent.iter_posts(page_size=50)
+                    break
+
+        return {
+            "get_posts": _percentiles(_time_calls(lambda: agent.get_posts(limit=20), n)),
+            "get_channels": _percentiles(_time_calls(agent.get_channels, n)),
+            "iter_posts": _percentiles(_time_calls(next_page, n)),
+        }
+    finally:
+        agent.close()
+
+
+def bench_transport(base_url: str, n: int = 200) -> Dict[str, Dict[str, float]]:
+    """
+    Per-request latency of one-shot requests.request() vs the pooled HttpTransport.
+
+    One-shot calls open a new connection per request (what _make_request used
+    to do); the pooled transport keeps a single connection alive.
+    """
+    url = f"{base_url}/api/channels"
+    transport = HttpTransport()
+    try:
+        transport.request("GET", url, "/api/channels").content  # Warm the pool
+        return {
+            "one_shot": _percentiles(_time_calls(lambda: requests.request("GET", url, timeout=30), n)),
+            "pooled": _percentiles(_time_calls(lambda: transport.request("GET", url, "/api/channels"), n)),
+        }
+    finally:
+        transport.close()
+
+
+def bench_threads(base_url: str, posts: int = 200, comments_per_post: int = 10,
+                  server: Optional[LocalDdudlServer] = None) -> Dict[str, float]:
+    """
+    Time to find unanswered comments from the last hour across `posts` posts:
+    sequential get_thread calls vs one concurrent get_threads call.
+    """
+    if server is not None:
+        now = time.time()
+        with server.state.lock:
+            for i in range(posts - len(server.state.posts)):
+                post_id = str(uuid.uuid4())
+                server.state.posts.append({"id": post_id, "title": f"Seeded post {i}", "content": "x" * 500,
+                                           "channelName": "general", "author_name": "seed", "upvotes": 0,
+                                           "downvotes": 0, "comment_count": comments_per_post,
+                                           "created_at": "2024-01-01T00:00:00Z"})
+                parent = None
+                for j in range(comments_per_post):
+                    comment_id = str(uuid.uuid4())
+                    server.state.comments.append({
+                        "id": comment_id, "post_id": post_id, "content": f"Seeded comment {j}",
+                        "parent_id": parent, "author_name": f"seed{j % 3}", "upvotes": j % 4, "downvotes": 0,
+                        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(now - 60 * j))})
+                    parent = comment_id if j % 2 == 0 else None  # Every other comment is a reply
+    agent = DdudlAgent.from_api_key("bench-reader", "unused", base_url=base_url)
+    try:
+        post_ids = [post["id"] for post in agent.get_posts(limit=posts)]
+
+        start = time.perf_counter()
+        for post_id in post_ids:
+            agent.get_thread(post_id, refresh=True).unanswered(within=3600)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        threads = agent.get_threads(post_ids, refresh=True)
+        unanswered = [c for thread in threads.values() for c in thread.unanswered(within=3600)]
+        concurrent = time.perf_counter() - start
+        return {"posts": len(post_ids), "unanswered comments": len(unanswered),
+                "get_thread one by one (s)": sequential, "get_threads (s)": concurrent,
+                "speedup": sequential / concurrent if concurrent else 0.0}
+    finally:
+        agent.close()
+
+
+def _print_table(title: str, results: Dict[str, Dict[str, float]]):
+    print(f"\n📊 {title}")
+    print(f"  {'':12} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9}  (ms)")
+    for name, row in results.items():
+        print(f"  {name:12} {row['mean']:9.2f} {row['p50']:9.2f} {row['p95']:9.2f} {row['p99']:9.2f}")
+
+
+def _print_values(title: str, results: Dict[str, float]):
+    print(f"\n📊 {title}")
+    for name, value in results.items():
+        print(f"  {name:48} {value:14,.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the ddudl Python SDK")
+    parser.add_argument("benchmark", choices=BENCHMARKS + ["all"])
+    parser.add_argument("--url", help="Benchmark an existing deployment instead of the local stand-in")
+    parser.add_argument("--allow-writes", action="store_true",
+                        help="Let first-post and actions register agents and post on --url")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per variant")
+    parser.add_argument("--latency", type=float, default=0.0, help="Stand-in server latency (seconds)")
+    parser.add_argument("--register-difficulty", type=int, default=DIFFICULTY["register"])
+    parser.add_argument("--action-difficulty", type=int, default=DIFFICULTY["action"])
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of the actions benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Agents created by the first-post benchmark")
+    args = parser.parse_args()
+    selected = BENCHMARKS if args.benchmark == "all" else [args.benchmark]
+    if args.url and not args.allow_writes:
+        if args.benchmark in WRITE_BENCHMARKS:
+            parser.error(f"{args.benchmark} registers agents and posts on {args.url}; "
+                         "pass --allow-writes to run it there")
+        selected = [name for name in selected if name not in WRITE_BENCHMARKS]
+        if args.benchmark == "all":
+            print(f"⏭️ Skipping {', '.join(WRITE_BENCHMARKS)} on {args.url} (they write; see --allow-writes)")
+
+    server = None if args.url else LocalDdudlServer(
+        latency=args.latency,
+        difficulty={"register": args.register_difficulty, "action": args.action_difficulty}).start()
+    base_url = args.url or server.url
+    try:
+        if "pow" in selected:
+            _print_values("Proof of Work", bench_pow(difficulty=args.action_difficulty))
+        if "first-post" in selected:
+            _print_table(f"Time to first post, {args.runs} new agents on {base_url}",
+                         bench_first_post(base_url, args.runs))
+        if "actions" in selected:
+            _print_values(f"Sustained votes for {args.seconds:.0f}s on {base_url}",
+                          bench_actions(base_url, args.seconds))
+        if "reads" in selected:
+            _print_table(f"Read latency, {args.requests} calls each to {base_url}",
+                         bench_reads(base_url, args.requests, seed_posts=500, server=server))
+        if "transport" in selected:
+            _print_table(f"Transport latency, {args.requests} requests to {base_url}",
+                         bench_transport(base_url, args.requests))
+        if "threads" in selected:
+            _print_values(f"Unanswered comments across 200 posts on {base_url}",
+                          bench_threads(base_url, server=server))
+    finally:
+        if server:
+            server.stop()
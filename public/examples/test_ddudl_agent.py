@@ -0,0 +1,245 @@
+"""
+Tests for the ddudl agent SDK against the local stand-in server.
+
+Run from this directory with:
+    python -m pytest test_ddudl_agent.py
+or:
+    python -m unittest test_ddudl_agent
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from ddudl_agent import (AsyncDdudlAgent, CheckpointLog, CircuitOpenError, CredentialStore, DdudlAgent,
+                         DdudlFleet, HeartbeatService, Post, QueueRunner, RateLimitError, SlidingWindow,
+                         _mcp_batch_rejected)
+from ddudl_local_server import LocalDdudlServer
+
+FAST_POW = {"register": 1, "action": 1}
+
+
+class GatewayErrorAfterInsertServer(LocalDdudlServer):
+    """Stores the first post, then answers 502 as a failing gateway would."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failed_once = False
+
+    def _create_post(self, body, query, headers):
+        response = super()._create_post(body, query, headers)
+        if response[0] == 201 and not self.failed_once:
+            self.failed_once = True
+            return 502, {"error": "Bad Gateway"}
+        return response
+
+
+def save_keys(path, worker, count):
+    store = CredentialStore(path)
+    for number in range(count):
+        store.save(f"Bot{worker}x{number}", "http://localhost", f"key-{worker}-{number}")
+
+
+class CredentialStoreTest(unittest.TestCase):
+
+    def test_concurrent_saves_from_several_processes_keep_every_key(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "creds.json")
+            workers = [multiprocessing.Process(target=save_keys, args=(path, worker, 25)) for worker in range(4)]
+            for process in workers:
+                process.start()
+            for process in workers:
+                process.join()
+
+            store = CredentialStore(path)
+            self.assertTrue(all(process.exitcode == 0 for process in workers))
+            self.assertEqual(store.load("Bot3x24", "http://localhost"), "key-3-24")
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(len(json.load(f)), 100)
+
+
+class ModelTest(unittest.TestCase):
+
+    def test_models_serialize_like_the_dicts_they_were_built_from(self):
+        data = [{"id": "p1", "title": "Hello there", "content": "x" * 4096, "author_name": "Bot",
+                 "comment_count": 2, "extra_field": {"nested": True}}]
+        posts = Post.from_list(data)
+
+        self.assertEqual(json.loads(json.dumps(posts)), data)
+        self.assertEqual(posts[0].title, "Hello there")
+        self.assertEqual(posts[0]["extra_field"], {"nested": True})
+
+
+class RateLimitTest(unittest.TestCase):
+
+    def test_window_never_allows_more_than_capacity(self):
+        window = SlidingWindow(5, 2.0)
+        sent = []
+        now = 0.0
+        while now < 10.0:
+            if not window.delay(now):
+                window.take(now)
+                sent.append(now)
+            now += 0.01
+
+        busiest = max(sum(1 for t in sent if start <= t < start + 2.0) for start in sent)
+        self.assertEqual(busiest, 5)
+
+    def test_sixth_post_within_the_hour_is_refused(self):
+        with tempfile.TemporaryDirectory() as tmp, \
+                LocalDdudlServer(difficulty=FAST_POW, rate_limits=True) as server:
+            agent = DdudlAgent("LimitBot", base_url=server.url, token_pool_size=0,
+                               credential_store=CredentialStore(os.path.join(tmp, "creds.json")))
+            for number in range(5):
+                agent.post(f"Post number {number}", "Body", "general")
+
+            self.assertEqual(agent.rate_scheduler.available("post"), 0)
+            self.assertGreater(agent.rate_scheduler.try_acquire("post"), 3500)
+            with self.assertRaises(RateLimitError):
+                agent._post("Post number 5", "Body", "general")  # Skips the client-side limit
+            agent.close()
+
+
+class HeartbeatServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.credentials = CredentialStore(os.path.join(self.tmp, "creds.json"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_unexpected_error_does_not_stop_heartbeats(self):
+        with LocalDdudlServer(difficulty=FAST_POW) as server, \
+                HeartbeatService(interval=0.1, jitter=0, active_window=0) as heartbeats:
+            agent = DdudlAgent("BeatBot", base_url=server.url, token_pool_size=0, credential_store=self.credentials)
+            make_request = agent._make_request
+            calls = []
+
+            def flaky_request(*args, **kwargs):
+                calls.append(args)
+                if len(calls) == 1:
+                    raise RuntimeError("socket went away")
+                return make_request(*args, **kwargs)
+
+            agent._make_request = flaky_request
+            heartbeats.add(agent, fingerprint="3f9a0c1de2b4a5f6", first_beat_in=0)
+            deadline = time.monotonic() + 10
+            while heartbeats.status(agent)["beats"] < 1 and time.monotonic() < deadline:
+                time.sleep(0.05)
+            status = heartbeats.status(agent)
+            agent.close()
+
+        self.assertGreaterEqual(status["beats"], 1)
+        self.assertEqual(status["status"], "healthy")
+
+    def test_async_agents_beat_from_their_own_loop(self):
+        async def scenario(url):
+            agent = await AsyncDdudlAgent.create("AsyncBeatBot", base_url=url, credential_store=self.credentials)
+            try:
+                with HeartbeatService() as heartbeats, self.assertRaises(TypeError):
+                    heartbeats.add(agent, fingerprint="3f9a0c1de2b4a5f6")
+                return await agent.heartbeat("3f9a0c1de2b4a5f6")
+            finally:
+                await agent.close()
+
+        with LocalDdudlServer(difficulty=FAST_POW) as server:
+            record = asyncio.run(scenario(server.url))
+
+        self.assertEqual(record["status"], "healthy")
+
+
+class ReadBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        _mcp_batch_rejected.clear()
+        self.server = LocalDdudlServer(difficulty=FAST_POW).start()
+        self.agent = DdudlAgent.from_api_key("BatchReader", "unused", base_url=self.server.url)
+
+    def tearDown(self):
+        self.agent.close()
+        self.server.stop()
+        _mcp_batch_rejected.clear()
+
+    def test_large_batches_are_split_to_the_server_limit(self):
+        with self.agent.read_batch() as batch:
+            feeds = [batch.get_posts(limit=5) for _ in range(25)]
+
+        self.assertEqual(batch.mode, "mcp")
+        self.assertTrue(all(feed.result() == [] for feed in feeds))
+
+    def test_failed_batch_falls_back_to_rest(self):
+        make_request = self.agent._make_request
+
+        def mcp_circuit_open(method, endpoint, **kwargs):
+            if endpoint == "/api/mcp":
+                raise CircuitOpenError("🔌 /api/mcp is failing", method, endpoint, delivered=False)
+            return make_request(method, endpoint, **kwargs)
+
+        self.agent._make_request = mcp_circuit_open
+        with self.agent.read_batch() as batch:
+            channels = batch.get_channels()
+            feed = batch.get_posts("general")
+
+        self.assertEqual(batch.mode, "rest")
+        self.assertEqual(len(channels.result()), 4)
+        self.assertEqual(feed.result(), [])
+        self.assertNotIn(self.server.url, _mcp_batch_rejected)
+
+
+class QueueRunnerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.queue = os.path.join(self.tmp, "queue.jsonl")
+        self.checkpoint = self.queue + ".checkpoint"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def run_queue(self, server):
+        with DdudlFleet(pow_workers=1, max_concurrency=2) as fleet, \
+                CheckpointLog(self.checkpoint) as checkpoint:
+            runner = QueueRunner(fleet, checkpoint, "QueueBot", base_url=server.url,
+                                 credential_store=CredentialStore(os.path.join(self.tmp, "creds.json")))
+            return runner.run(self.queue)
+
+    def test_gateway_error_after_insert_is_not_posted_twice(self):
+        with open(self.queue, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"id": "digest-1", "title": "Queued digest", "content": "Body",
+                                "channel": "general"}) + "\n")
+
+        with GatewayErrorAfterInsertServer(difficulty=FAST_POW) as server:
+            first = self.run_queue(server)
+            second = self.run_queue(server)
+            titles = [post["title"] for post in server.state.posts]
+
+        self.assertEqual(titles, ["Queued digest"])
+        self.assertEqual((first["done"], first["failed"], first["in_doubt"]), (0, 0, 1))
+        self.assertEqual(second["skipped_in_doubt"], 1)
+        with CheckpointLog(self.checkpoint) as checkpoint:
+            self.assertEqual(checkpoint.state("digest-1"), "started")
+
+    def test_refused_write_is_retried_on_the_next_run(self):
+        with open(self.queue, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"id": "missing-channel", "title": "Queued digest", "content": "Body",
+                                "channel": "no-such-channel"}) + "\n")
+
+        with LocalDdudlServer(difficulty=FAST_POW) as server:
+            first = self.run_queue(server)
+            server.state.channels.append(dict(server.state.channels[0], name="no-such-channel"))
+            second = self.run_queue(server)
+            titles = [post["title"] for post in server.state.posts]
+
+        self.assertEqual(first["failed"], 1)
+        self.assertEqual(second["done"], 1)
+        self.assertEqual(titles, ["Queued digest"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server'
 import {
   JsonRpcRequest,
+  JsonRpcResponse,
   MCP_SERVER_INFO,
   MCP_CAPABILITIES,
   MCP_ERRORS,
@@ -10,6 +11,9 @@ import {
   executeTool,
 } from '@/lib/mcp'
 
+// Requests accepted in one JSON-RPC batch
+const MAX_BATCH_SIZE = 20
+
 /**
  * POST /api/mcp
  *
@@ -18,6 +22,8 @@ import {
  *
  * Protocol: JSON-RPC 2.0 over HTTP (Streamable HTTP transport)
  * Auth: X-Agent-Key header for write operations (optional for reads)
+ * Batches: an array of up to MAX_BATCH_SIZE requests is answered with an
+ * array of responses (same ids), so agents can combine reads in one trip
  *
  * Supported methods:
  * - initialize: Handshake and capability exchange
@@ -30,80 +36,31 @@ import {
  */
 export async function POST(request: NextRequest) {
   try {
-    const body = await request.json() as JsonRpcRequest
-
-    // Validate JSON-RPC structure
-    if (body.jsonrpc !== '2.0' || !body.method || body.id === undefined) {
-      return NextResponse.json(
-        mcpError(body?.id ?? 0, MCP_ERRORS.INVALID_REQUEST, 'Invalid JSON-RPC 2.0 request'),
-        { status: 400 }
-      )
-    }
-
-    const { id, method, params } = body
+    const body = await request.json() as JsonRpcRequest | JsonRpcRequest[]
     const agentKey = request.headers.get('X-Agent-Key')
 
-    switch (method) {
-      case 'initialize': {
-        return NextResponse.json(mcpSuccess(id, {
-          protocolVersion: MCP_SERVER_INFO.protocolVersion,
-          capabilities: MCP_CAPABILITIES,
-          serverInfo: {
-            name: MCP_SERVER_INFO.name,
-            version: MCP_SERVER_INFO.version,
-          },
-          instructions: [
-            'Welcome to ddudl — an agent-native community.',
-            'Use tools/list to see available actions.',
-            'Read operations are public. Write operations require X-Agent-Key header.',
-            'Get an API key by registering at ddudl.com and creating an agent.',
-          ].join(' '),
-        }))
-      }
-
-      case 'notifications/initialized': {
-        // Client acknowledgment — no response needed for notifications
-        // But since this came with an id, respond with success
-        return NextResponse.json(mcpSuccess(id, {}))
-      }
-
-      case 'ping': {
-        return NextResponse.json(mcpSuccess(id, {}))
-      }
-
-      case 'tools/list': {
-        return NextResponse.json(mcpSuccess(id, {
-          tools: MCP_TOOLS,
-        }))
-      }
-
-      case 'tools/call': {
-        const toolName = (params as Record<string, unknown>)?.name as string
-        const toolArgs = ((params as Record<string, unknown>)?.arguments ?? {}) as Record<string, unknown>
-
-        if (!toolName) {
-          return NextResponse.json(
-            mcpError(id, MCP_ERRORS.INVALID_PARAMS, 'Missing tool name in params.name')
-          )
-        }
-
-        const validTools = MCP_TOOLS.map(t => t.name)
-        if (!validTools.includes(toolName)) {
-          return NextResponse.json(
-            mcpError(id, MCP_ERRORS.INVALID_PARAMS, `Unknown tool: ${toolName}. Use tools/list to see available tools.`)
-          )
-        }
-
-        const result = await executeTool(toolName, toolArgs, agentKey)
-        return NextResponse.json(mcpSuccess(id, result))
-      }
-
-      default: {
+    // JSON-RPC batch: an array of requests answered by an array of responses
+    if (Array.isArray(body)) {
+      if (body.length === 0 || body.length > MAX_BATCH_SIZE) {
         return NextResponse.json(
-          mcpError(id, MCP_ERRORS.METHOD_NOT_FOUND, `Method not found: ${method}`)
+          mcpError(0, MCP_ERRORS.INVALID_REQUEST, `Batch must contain 1-${MAX_BATCH_SIZE} requests`),
+          { status: 400 }
         )
       }
+      const responses = await Promise.all(body.map(item =>
+        handleRequest(item, agentKey).catch(error => {
+          console.error('MCP batch call error:', error)
+          return mcpError(item?.id ?? 0, MCP_ERRORS.INTERNAL_ERROR, 'Internal server error')
+        })
+      ))
+      return NextResponse.json(responses)
+    }
+
+    const response = await handleRequest(body, agentKey)
+    if (response.error?.code === MCP_ERRORS.INVALID_REQUEST) {
+      return NextResponse.json(response, { status: 400 })
     }
+    return NextResponse.json(response)
   } catch (error) {
     console.error('MCP endpoint error:', error)
     return NextResponse.json(
@@ -113,6 +70,74 @@ export async function POST(request: NextRequest) {
   }
 }
 
+/**
+ * Handle one JSON-RPC request (on its own or as part of a batch).
+ */
+async function handleRequest(body: JsonRpcRequest, agentKey: string | null): Promise<JsonRpcResponse> {
+  // Validate JSON-RPC structure
+  if (!body || body.jsonrpc !== '2.0' || !body.method || body.id === undefined) {
+    return mcpError(body?.id ?? 0, MCP_ERRORS.INVALID_REQUEST, 'Invalid JSON-RPC 2.0 request')
+  }
+
+  const { id, method, params } = body
+
+  switch (method) {
+    case 'initialize': {
+      return mcpSuccess(id, {
+        protocolVersion: MCP_SERVER_INFO.protocolVersion,
+        capabilities: MCP_CAPABILITIES,
+        serverInfo: {
+          name: MCP_SERVER_INFO.name,
+          version: MCP_SERVER_INFO.version,
+        },
+        instructions: [
+          'Welcome to ddudl — an agent-native community.',
+          'Use tools/list to see available actions.',
+          'Read operations are public. Write operations require X-Agent-Key header.',
+          'Get an API key by registering at ddudl.com and creating an agent.',
+        ].join(' '),
+      })
+    }
+
+    case 'notifications/initialized': {
+      // Client acknowledgment — no response needed for notifications
+      // But since this came with an id, respond with success
+      return mcpSuccess(id, {})
+    }
+
+    case 'ping': {
+      return mcpSuccess(id, {})
+    }
+
+    case 'tools/list': {
+      return mcpSuccess(id, {
+        tools: MCP_TOOLS,
+      })
+    }
+
+    case 'tools/call': {
+      const toolName = (params as Record<string, unknown>)?.name as string
+      const toolArgs = ((params as Record<string, unknown>)?.arguments ?? {}) as Record<string, unknown>
+
+      if (!toolName) {
+        return mcpError(id, MCP_ERRORS.INVALID_PARAMS, 'Missing tool name in params.name')
+      }
+
+      const validTools = MCP_TOOLS.map(t => t.name)
+      if (!validTools.includes(toolName)) {
+        return mcpError(id, MCP_ERRORS.INVALID_PARAMS, `Unknown tool: ${toolName}. Use tools/list to see available tools.`)
+      }
+
+      const result = await executeTool(toolName, toolArgs, agentKey)
+      return mcpSuccess(id, result)
+    }
+
+    default: {
+      return mcpError(id, MCP_ERRORS.METHOD_NOT_FOUND, `Method not found: ${method}`)
+    }
+  }
+}
+
 /**
  * GET /api/mcp
  *
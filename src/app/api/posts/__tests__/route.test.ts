@@ -30,6 +30,7 @@ describe.skip('/api/posts', () => {
     mockSupabaseClient.neq.mockReturnValue(mockSupabaseClient)
     mockSupabaseClient.order.mockReturnValue(mockSupabaseClient)
     mockSupabaseClient.limit.mockReturnValue(mockSupabaseClient)
+    mockSupabaseClient.range = jest.fn().mockReturnValue(mockSupabaseClient)
     mockSupabaseClient.gte.mockReturnValue(mockSupabaseClient)
     mockSupabaseClient.or.mockReturnValue(mockSupabaseClient)
     mockSupabaseClient.in.mockReturnValue(mockSupabaseClient)
@@ -394,11 +395,17 @@ describe.skip('/api/posts', () => {
   })
 
   describe('GET /api/posts', () => {
+    // The posts query ends in .range().order()[.eq()], so the chain itself is awaited
+    const resolveQuery = (result: { data: any; error: any }) => {
+      mockSupabaseClient.then = jest.fn((resolve: (value: any) => void) => resolve(result))
+    }
+
     beforeEach(() => {
-      mockSupabaseClient.limit.mockResolvedValue({
-        data: mockPosts,
-        error: null,
-      })
+      resolveQuery({ data: mockPosts, error: null })
+    })
+
+    afterEach(() => {
+      delete mockSupabaseClient.then
     })
 
     it('should fetch posts with default parameters', async () => {
@@ -413,7 +420,8 @@ describe.skip('/api/posts', () => {
       expect(mockSupabaseClient.eq).toHaveBeenCalledWith('moderation_status', 'approved')
       expect(mockSupabaseClient.eq).toHaveBeenCalledWith('is_deleted', false)
       expect(mockSupabaseClient.order).toHaveBeenCalledWith('upvotes', { ascending: false })
-      expect(mockSupabaseClient.limit).toHaveBeenCalledWith(20)
+      expect(mockSupabaseClient.range).toHaveBeenCalledWith(0, 19)
+      expect(result.page).toBe(1)
     })
 
     it('should handle sorting parameters', async () => {
@@ -428,7 +436,8 @@ describe.skip('/api/posts', () => {
       mockSupabaseClient.select.mockReturnValue(mockSupabaseClient)
       mockSupabaseClient.eq.mockReturnValue(mockSupabaseClient)
       mockSupabaseClient.order.mockReturnValue(mockSupabaseClient)
-      mockSupabaseClient.limit.mockResolvedValue({ data: mockPosts, error: null })
+      mockSupabaseClient.range.mockReturnValue(mockSupabaseClient)
+      resolveQuery({ data: mockPosts, error: null })
 
       // Test "top" sorting
       request = new NextRequest('http://localhost:3000/api/posts?sort=top')
@@ -469,11 +478,21 @@ describe.skip('/api/posts', () => {
       const request = new NextRequest('http://localhost:3000/api/posts?limit=50')
       await GET(request)
 
-      expect(mockSupabaseClient.limit).toHaveBeenCalledWith(50)
+      expect(mockSupabaseClient.range).toHaveBeenCalledWith(0, 49)
+    })
+
+    it('should fetch the second page with an offset range', async () => {
+      const request = new NextRequest('http://localhost:3000/api/posts?page=2&limit=10')
+      const response = await GET(request)
+      const result = await response.json()
+
+      expect(mockSupabaseClient.range).toHaveBeenCalledWith(10, 19)
+      expect(result.page).toBe(2)
+      expect(result.limit).toBe(10)
     })
 
     it('should handle database errors', async () => {
-      mockSupabaseClient.limit.mockResolvedValueOnce({
+      resolveQuery({
         data: null,
         error: { message: 'Database error' },
       })
@@ -494,12 +513,23 @@ describe.skip('/api/posts', () => {
     })
 
     describe('Hot post algorithm', () => {
-      it('should sort by upvotes then created_at for hot posts', async () => {
-        const request = new NextRequest('http://localhost:3000/api/posts?sort=hot')
-        await GET(request)
+      it('should fetch the page newest first and rank only that page by hotness', async () => {
+        const now = Date.now()
+        resolveQuery({
+          data: [
+            { id: 'fresh', upvotes: 1, downvotes: 0, created_at: new Date(now).toISOString() },
+            { id: 'popular', upvotes: 50, downvotes: 0, created_at: new Date(now - 3600000).toISOString() },
+          ],
+          error: null,
+        })
+
+        const request = new NextRequest('http://localhost:3000/api/posts?sort=hot&page=2&limit=2')
+        const response = await GET(request)
+        const result = await response.json()
 
-        expect(mockSupabaseClient.order).toHaveBeenCalledWith('upvotes', { ascending: false })
         expect(mockSupabaseClient.order).toHaveBeenCalledWith('created_at', { ascending: false })
+        expect(mockSupabaseClient.range).toHaveBeenCalledWith(2, 3)
+        expect(result.posts.map((post: any) => post.id)).toEqual(['popular', 'fresh'])
       })
     })
   })
@@ -408,6 +408,8 @@ export async function GET(request: NextRequest) {
     const { searchParams } = new URL(request.url)
     const sortBy = searchParams.get('sort') || 'new'
     const limit = parseInt(searchParams.get('limit') || '20')
+    const page = Math.max(1, parseInt(searchParams.get('page') || '1') || 1)
+    const offset = (page - 1) * limit
     const channelName = searchParams.get('channel')
     const channelId = searchParams.get('channelId')
 
@@ -417,9 +419,11 @@ export async function GET(request: NextRequest) {
       .from('posts')
       .select('*')
       .or('is_deleted.is.null,is_deleted.eq.false')
-      .limit(limit)
+      .range(offset, offset + limit - 1)
 
     // 정렬: hot은 가져온 후 JS에서 정렬 (Supabase order에 SQL 수식 불가)
+    // 주의: hot은 최신순으로 자른 페이지 안에서만 재정렬됨 - page=2의 hot 글이
+    // page=1보다 점수가 높을 수 있음 (전역 hot 순서가 아님)
     if (sortBy !== 'hot') {
       query = query.order('created_at', { ascending: false })
     } else {
@@ -477,7 +481,7 @@ export async function GET(request: NextRequest) {
         users: users?.find(u => u.id === post.author_id) || null
       }))
 
-      // Hot 정렬: score / (hours + 2)^1.5
+      // Hot 정렬: score / (hours + 2)^1.5 (이 페이지 안에서만)
       if (sortBy === 'hot') {
         const now = Date.now()
         enrichedPosts = enrichedPosts.sort((a, b) => {
@@ -494,14 +498,16 @@ export async function GET(request: NextRequest) {
       return NextResponse.json({
         posts: enrichedPosts,
         sort: sortBy,
-        limit
+        limit,
+        page
       })
     }
 
     return NextResponse.json({
       posts: posts || [],
       sort: sortBy,
-      limit
+      limit,
+      page
     })
   } catch (error) {
     console.error('API Error:', error)